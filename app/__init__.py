@@ -4,28 +4,39 @@ from dotenv import load_dotenv
 from .config import Config
 from .utils.db import db
 from .utils.celery import make_celery
-from .utils.sse import sse_bp
-from flask_migrate import Migrate
 
-from .modules.auth.routes import auth_bp
-from .modules.data_transfer.routes import transfer_bp
-from .modules.pull_api.routes import pull_bp
-from .modules.push_api.routes import push_bp
-from flask import Response, stream_with_context
-from flasgger import Swagger
-from flask_cors import CORS
+# Blueprints, flasgger, CORS and Flask-Migrate are only needed by the web app,
+# so they are imported inside create_app() — Celery workers boot through
+# create_worker_app() and never pay for them.
 
-migrate = Migrate()
 
 def unique_id(view_func):
     return f"{view_func.__module__}.{view_func.__name__}"
 
+def create_worker_app():
+    """Minimal app for Celery workers: config, DB and the task modules only."""
+    load_dotenv()
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    db.init_app(app)
+    app.celery_app = make_celery(app)
+    return app
+
 def create_app():
+    from flask_migrate import Migrate
+    from flasgger import Swagger
+    from flask_cors import CORS
+    from .utils.sse import sse_bp
+    from .modules.auth.routes import auth_bp
+    from .modules.data_transfer.routes import transfer_bp
+    from .modules.pull_api.routes import pull_bp
+    from .modules.push_api.routes import push_bp
+
     load_dotenv()
     app = Flask(__name__, template_folder='templates', static_folder='static')
     app.config.from_object(Config)
     db.init_app(app)
-    migrate.init_app(app, db)
+    Migrate(app, db)
     celery = make_celery(app)
     app.celery_app = celery
     app.register_blueprint(auth_bp)
@@ -0,0 +1,81 @@
+import json, time
+
+from flask import current_app
+
+from ...utils.redis_client import r
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Per‑table sync checkpoints, stored in Redis
+#
+# Checkpoints expire after CHECKPOINT_TTL seconds, so a run that failed long
+# ago cannot make a later sync skip rows that have changed since.
+# ──────────────────────────────────────────────────────────────────────────────
+KEY_PREFIX = "sync:checkpoint"
+
+# delete the key only if it still belongs to the given run; a corrupt value
+# is deleted too, matching load_checkpoint() treating it as "no checkpoint"
+_CLEAR_IF_OWNER = r.register_script("""
+local raw = redis.call('GET', KEYS[1])
+if not raw then
+    return 0
+end
+local ok, ckpt = pcall(cjson.decode, raw)
+if not ok or type(ckpt) ~= 'table' or ckpt['run_id'] == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""")
+
+
+def _key(table_name: str) -> str:
+    return f"{KEY_PREFIX}:{table_name}"
+
+
+def load_checkpoint(table_name: str) -> dict | None:
+    """Return the last committed position for *table_name*, or ``None``."""
+    raw = r.get(_key(table_name))
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        # a corrupt checkpoint must never block a sync — start over instead
+        return None
+
+
+def save_checkpoint(
+    table_name: str, run_id: str, last_id, processed: int, fingerprint: str = ""
+) -> None:
+    """Record the keyset position reached after a chunk has been committed.
+
+    *fingerprint* identifies the row set being copied (see
+    ``specs.spec_fingerprint``); a run with a different one must not resume.
+    """
+    r.set(
+        _key(table_name),
+        json.dumps(
+            {
+                "table": table_name,
+                "run_id": run_id,
+                "last_id": last_id,
+                "processed": processed,
+                "fingerprint": fingerprint,
+                "updated_at": time.time(),
+            },
+            default=str,
+        ),
+        ex=current_app.config["CHECKPOINT_TTL"],
+    )
+
+
+def clear_checkpoint(table_name: str, run_id: str | None = None) -> None:
+    """Forget the checkpoint, so the next run starts from scratch.
+
+    With *run_id*, only a checkpoint written by that run is removed; another
+    run's position for the same table is left alone.
+    """
+    if run_id is None:
+        r.delete(_key(table_name))
+    else:
+        _CLEAR_IF_OWNER(keys=[_key(table_name)], args=[run_id])
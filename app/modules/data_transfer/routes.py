@@ -1,7 +1,13 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+import re
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from .tasks import sync_table_task
+from .specs import parse_specs
+from .runs import list_runs, get_run, get_run_logs
 from ...modules.auth.decorators import basic_auth_required
 
+# Redis stream entry id: "<ms>" or "<ms>-<seq>"
+STREAM_ID = re.compile(r"\d+(-\d+)?")
+
 transfer_bp = Blueprint('transfer', __name__, template_folder='../../templates/data_transfer')
 
 @transfer_bp.route('/')
@@ -14,7 +20,41 @@ def transfer_home():
 def start_sync():
     tables = [t.strip() for t in request.form['tables'].split(',')]
     modified_col = request.form.get('modified_col', 'server_modified_date')
+    restart = request.form.get('restart') == 'on'
+    try:
+        specs = parse_specs(request.form.get('spec', ''), allow_where=False)
+    except ValueError as exc:
+        flash(f'Invalid sync spec: {exc}')
+        return redirect(url_for('transfer.transfer_home'))
     for table in tables:
-        sync_table_task.delay(table, modified_col)
+        sync_table_task.delay(table, modified_col, restart=restart, spec=specs.get(table))
     flash('Sync tasks queued')
     return redirect(url_for('transfer.transfer_home'))
+
+@transfer_bp.route('/runs', methods=['GET'])
+@basic_auth_required
+def runs():
+    """Past sync runs, newest first; filter with ?table= and cap with ?limit=."""
+    limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+    return jsonify(list_runs(request.args.get('table') or None, limit))
+
+@transfer_bp.route('/runs/<run_id>', methods=['GET'])
+@basic_auth_required
+def run_detail(run_id):
+    run = get_run(run_id)
+    if run is None:
+        return jsonify({"error": "run not found"}), 404
+    return jsonify(run)
+
+@transfer_bp.route('/runs/<run_id>/logs', methods=['GET'])
+@basic_auth_required
+def run_logs(run_id):
+    """One page of a run's logs; pass the returned ``next`` back as ?after=."""
+    if get_run(run_id) is None:
+        return jsonify({"error": "run not found"}), 404
+    after = request.args.get('after') or None
+    if after is not None and not STREAM_ID.fullmatch(after):
+        return jsonify({"error": "invalid 'after' cursor"}), 400
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    logs, next_cursor = get_run_logs(run_id, after, limit)
+    return jsonify({"logs": logs, "next": next_cursor})
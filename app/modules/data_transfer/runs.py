@@ -0,0 +1,184 @@
+import logging, time
+
+from flask import current_app
+
+from ...utils.redis_client import r
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Run history, stored in Redis
+#
+#   sync:runs               ZSET  run_id → start time (newest = highest score)
+#   sync:run:<id>           HASH  table, status, attempts, processed, total,
+#                                 started_at, finished_at, error, phase:<name>
+#   sync:run:<id>:logs      STREAM  one entry per log record, capped
+#
+# Only the newest RUN_HISTORY_LIMIT runs are kept; older finished ones are
+# deleted together with their log streams when a new run is registered.  Every
+# write also refreshes a RUN_TTL expiry on both keys, so runs whose worker died
+# mid-way (and would otherwise stay "running" forever) are still cleaned up.
+# ──────────────────────────────────────────────────────────────────────────────
+RUNS_KEY = "sync:runs"
+
+
+def _run_key(run_id: str) -> str:
+    return f"sync:run:{run_id}"
+
+
+def _logs_key(run_id: str) -> str:
+    return f"sync:run:{run_id}:logs"
+
+
+class RunRecorder:
+    """Records one sync run: status, progress, phase timings and log lines."""
+
+    def __init__(self, run_id: str, table_name: str):
+        self.run_id = run_id
+        self.table_name = table_name
+        self.key = _run_key(run_id)
+        self._phase_start = time.perf_counter()
+
+    def start(self) -> None:
+        """Register the run (or a retry of it) as running."""
+        now = time.time()
+        with r.pipeline() as pipe:
+            pipe.hsetnx(self.key, "started_at", now)
+            # a retry is running again — drop the previous attempt's outcome
+            pipe.hdel(self.key, "finished_at", "error")
+            pipe.hset(self.key, mapping={
+                "run_id": self.run_id,
+                "table": self.table_name,
+                "status": "running",
+            })
+            pipe.hincrby(self.key, "attempts", 1)
+            pipe.zadd(RUNS_KEY, {self.run_id: now}, nx=True)
+            pipe.expire(self.key, current_app.config["RUN_TTL"])
+            pipe.execute()
+        _trim_history()
+
+    def _hset(self, mapping: dict) -> None:
+        # HSET may recreate a trimmed key, so always (re)apply the expiry
+        with r.pipeline() as pipe:
+            pipe.hset(self.key, mapping=mapping)
+            pipe.expire(self.key, current_app.config["RUN_TTL"])
+            pipe.execute()
+
+    def progress(self, processed: int, total: int) -> None:
+        self._hset({"processed": processed, "total": total})
+
+    def phase_done(self, name: str) -> None:
+        """Store the ms spent since the previous phase ended as ``phase:<name>``."""
+        now = time.perf_counter()
+        self._hset({f"phase:{name}": round((now - self._phase_start) * 1000, 1)})
+        self._phase_start = now
+
+    def log(self, level: str, message: str) -> None:
+        logs_key = _logs_key(self.run_id)
+        with r.pipeline() as pipe:
+            pipe.xadd(
+                logs_key,
+                {"level": level, "message": message},
+                maxlen=current_app.config["RUN_LOG_MAXLEN"],
+                approximate=True,
+            )
+            pipe.expire(logs_key, current_app.config["RUN_TTL"])
+            pipe.execute()
+
+    def finish(self, status: str, error: str = "") -> None:
+        self._hset({
+            "status": status,
+            "finished_at": time.time(),
+            "error": error,
+        })
+
+
+class RunLogHandler(logging.Handler):
+    """Logging handler that appends every record to the run's log stream."""
+
+    def __init__(self, recorder: RunRecorder):
+        super().__init__()
+        self.recorder = recorder
+        self.setFormatter(
+            logging.Formatter("%(asctime)s %(levelname)s %(message)s")
+        )
+
+    def emit(self, record):
+        try:
+            self.recorder.log(record.levelname.lower(), self.format(record))
+        except Exception:
+            # never let logging failure crash the task
+            self.handleError(record)
+
+
+def make_run_logger(name: str, *handlers: logging.Handler) -> logging.Logger:
+    """A logger that is *not* registered with ``logging``'s manager.
+
+    ``logging.getLogger`` would keep every per-run logger (and a placeholder
+    referencing it) alive for the life of the worker; this one is garbage
+    once the run drops it.
+    """
+    logger = logging.Logger(name, logging.DEBUG)
+    logger.propagate = False
+    for handler in handlers:
+        logger.addHandler(handler)
+    return logger
+
+
+def release_logger(logger: logging.Logger) -> None:
+    """Detach and close a per-run logger's handlers."""
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def _trim_history() -> None:
+    stale = r.zrange(RUNS_KEY, 0, -current_app.config["RUN_HISTORY_LIMIT"] - 1)
+    if not stale:
+        return
+    with r.pipeline() as pipe:
+        for run_id in stale:
+            pipe.hget(_run_key(run_id), "status")
+        statuses = pipe.execute()
+    # runs still going are left for a later trim (or their RUN_TTL)
+    stale = [run_id for run_id, status in zip(stale, statuses) if status != "running"]
+    if not stale:
+        return
+    with r.pipeline() as pipe:
+        for run_id in stale:
+            pipe.delete(_run_key(run_id), _logs_key(run_id))
+        pipe.zrem(RUNS_KEY, *stale)
+        pipe.execute()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Queries used by the run history API
+# ──────────────────────────────────────────────────────────────────────────────
+def list_runs(table_name: str | None = None, limit: int = 50) -> list:
+    """Newest runs first, optionally only those for *table_name*."""
+    run_ids = r.zrevrange(RUNS_KEY, 0, -1 if table_name else limit - 1)
+    with r.pipeline(transaction=False) as pipe:
+        for run_id in run_ids:
+            pipe.hgetall(_run_key(run_id))
+        rows = pipe.execute()
+    runs = [
+        run for run in rows
+        if run and (not table_name or run.get("table") == table_name)
+    ]
+    return runs[:limit]
+
+
+def get_run(run_id: str) -> dict | None:
+    return r.hgetall(_run_key(run_id)) or None
+
+
+def get_run_logs(run_id: str, after: str | None = None, limit: int = 100) -> tuple:
+    """Return ``(entries, next_cursor)``; pass the cursor back as *after*.
+
+    The cursor is the last entry returned (or *after* itself when nothing new
+    has been logged), so a client can keep following a run that is still going.
+    """
+    start = f"({after}" if after else "-"
+    entries = r.xrange(_logs_key(run_id), min=start, max="+", count=limit)
+    logs = [{"id": entry_id, **fields} for entry_id, fields in entries]
+    next_cursor = logs[-1]["id"] if logs else after
+    return logs, next_cursor
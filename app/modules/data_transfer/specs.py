@@ -0,0 +1,174 @@
+import hashlib, json, os, re
+
+from flask import current_app
+from sqlalchemy import (
+    Column, Table, select, func, text, cast,
+    BigInteger, Boolean, Date, DateTime, Float, Integer, Numeric, String, Text,
+)
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Per‑table sync specs: column projection, row filter, renames and casts
+#
+#   {
+#     "client_v2": {
+#       "include": ["id", "name", "region", "server_modified_date"],
+#       "exclude": ["fingerprint_blob"],
+#       "where":   "region = 'AM'",
+#       "rename":  {"name": "full_name"},
+#       "cast":    {"region": "text"}
+#     }
+#   }
+#
+# Specs come from the JSON file named by SYNC_SPECS_FILE and/or the transfer
+# form; a form spec replaces the stored one for that table.  "where" is raw
+# SQL run against the source DB, so it is only accepted from SYNC_SPECS_FILE,
+# which operators control — form / task-argument specs may not carry it.  It
+# is parenthesised before being ANDed with the keyset condition, and may not
+# contain ":name" bind parameters — write a literal colon as \:
+# Source reads additionally run in READ ONLY transactions.
+# ──────────────────────────────────────────────────────────────────────────────
+SPEC_KEYS = {"include", "exclude", "where", "rename", "cast"}
+
+CAST_TYPES = {
+    "text": Text,
+    "varchar": String,
+    "integer": Integer,
+    "bigint": BigInteger,
+    "numeric": Numeric,
+    "float": Float,
+    "boolean": Boolean,
+    "date": Date,
+    "timestamp": DateTime,
+}
+
+# same pattern text() uses to find bind parameters; "::type" casts are fine
+_BIND_PARAM = re.compile(r"(?<![:\w\x5c]):(\w+)(?!:)")
+
+
+def validate_spec(spec: dict, allow_where: bool = True) -> dict:
+    """Check the shape of a single table spec; raise ``ValueError`` if bad.
+
+    Pass ``allow_where=False`` for specs from untrusted callers (the form),
+    which must not smuggle raw SQL into the source query.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("table spec must be an object")
+    unknown = set(spec) - SPEC_KEYS
+    if unknown:
+        raise ValueError(f"unknown spec keys: {sorted(unknown)}")
+    for key in ("include", "exclude"):
+        if not isinstance(spec.get(key) or [], list):
+            raise ValueError(f"{key!r} must be a list of column names")
+    for key in ("rename", "cast"):
+        if not isinstance(spec.get(key) or {}, dict):
+            raise ValueError(f"{key!r} must be an object")
+    bad = {t for t in (spec.get("cast") or {}).values() if str(t).lower() not in CAST_TYPES}
+    if bad:
+        raise ValueError(f"unsupported cast types {sorted(bad)}; use one of {sorted(CAST_TYPES)}")
+    where = spec.get("where") or ""
+    if where and not allow_where:
+        raise ValueError("'where' filters may only be set in SYNC_SPECS_FILE")
+    if not isinstance(where, str):
+        raise ValueError("'where' must be a SQL string")
+    binds = _BIND_PARAM.findall(where)
+    if binds:
+        raise ValueError(
+            f"'where' contains bind parameters {binds}; inline the values "
+            "or escape literal colons as '\\:'"
+        )
+    return spec
+
+
+def parse_specs(raw: str, allow_where: bool = True) -> dict:
+    """Parse a ``{table: spec}`` JSON document, validating every entry."""
+    if not raw or not raw.strip():
+        return {}
+    try:
+        specs = json.loads(raw)
+    except ValueError as exc:
+        raise ValueError(f"sync spec is not valid JSON: {exc}") from exc
+    if not isinstance(specs, dict):
+        raise ValueError("sync spec must map table names to specs")
+    return {table: validate_spec(spec, allow_where) for table, spec in specs.items()}
+
+
+def load_stored_spec(table_name: str) -> dict:
+    """Return the spec for *table_name* from SYNC_SPECS_FILE, or ``{}``."""
+    path = current_app.config.get("SYNC_SPECS_FILE")
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        return parse_specs(fh.read()).get(table_name, {})
+
+
+def spec_fingerprint(spec: dict, modified_col: str) -> str:
+    """Short hash of everything that decides which rows a sync copies."""
+    raw = json.dumps({"spec": spec, "modified_col": modified_col}, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+class Projection:
+    """The source → target column mapping a spec resolves to."""
+
+    def __init__(self, src_table: Table, spec: dict):
+        include = spec.get("include") or [c.name for c in src_table.columns]
+        exclude = set(spec.get("exclude") or [])
+        for key, names in (
+            ("include", include),
+            ("exclude", exclude),
+            ("rename", spec.get("rename") or {}),
+            ("cast", spec.get("cast") or {}),
+        ):
+            missing = sorted(n for n in names if n not in src_table.c)
+            if missing:
+                raise ValueError(f"{key!r} columns not in source {src_table.name!r}: {missing}")
+
+        # keyset paging and the upsert both need the PK, so it is never dropped
+        pk_names = [c.name for c in src_table.primary_key.columns]
+        names = [n for n in include if n not in exclude or n in pk_names]
+        names += [n for n in pk_names if n not in names]
+
+        self.rename = spec.get("rename") or {}
+        self.cast = {k: CAST_TYPES[v.lower()] for k, v in (spec.get("cast") or {}).items()}
+        self.where = spec.get("where") or None
+        self.src_cols = [src_table.c[n] for n in names]
+
+        targets = self.target_names
+        dupes = sorted({n for n in targets if targets.count(n) > 1})
+        if dupes:
+            raise ValueError(f"duplicate target column names: {dupes}")
+
+    def target_name(self, src_name: str) -> str:
+        return self.rename.get(src_name, src_name)
+
+    @property
+    def target_names(self) -> list:
+        return [self.target_name(c.name) for c in self.src_cols]
+
+    def target_columns(self) -> list:
+        """Fresh ``Column`` objects for creating the target table."""
+        return [
+            Column(
+                self.target_name(c.name),
+                self.cast[c.name]() if c.name in self.cast else c.type,
+                primary_key=c.primary_key,
+                nullable=c.nullable,
+            )
+            for c in self.src_cols
+        ]
+
+    def _filter(self, stmt):
+        # parenthesised, so an OR in the filter can't swallow the keyset bound
+        return stmt.where(text(f"({self.where})")) if self.where else stmt
+
+    def select(self):
+        """``SELECT`` of the projected, renamed and cast columns, filtered."""
+        exprs = [
+            (cast(c, self.cast[c.name]) if c.name in self.cast else c).label(self.target_name(c.name))
+            for c in self.src_cols
+        ]
+        return self._filter(select(*exprs))
+
+    def count(self, src_table: Table):
+        return self._filter(select(func.count()).select_from(src_table))
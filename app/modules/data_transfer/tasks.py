@@ -1,13 +1,17 @@
-import logging, os
+import logging, os, time
 from celery import shared_task
+from celery.exceptions import Retry
 from sqlalchemy import (
-    create_engine, MetaData, Table, select, func,
+    create_engine, MetaData, Table,
     inspect, delete
 )
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from ...utils.sse import announce  # ← only import THIS
+from .checkpoint import load_checkpoint, save_checkpoint, clear_checkpoint
+from .specs import Projection, load_stored_spec, spec_fingerprint, validate_spec
+from .runs import RunRecorder, RunLogHandler, make_run_logger, release_logger
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -46,19 +50,64 @@ def sync_table_task(
     self,
     table_name: str,
     modified_col: str = "server_modified_date",
+    restart: bool = False,
+    spec: dict | None = None,
 ) -> None:
-    """Synchronise a source → target table, streaming progress + logs via SSE."""
+    """Synchronise a source → target table, streaming progress + logs via SSE.
+
+    Progress is checkpointed after every committed chunk, so retries and
+    manual re-runs resume where the previous attempt stopped.  Pass
+    ``restart=True`` to discard the checkpoint and copy from scratch.
+
+    *spec* narrows the copy to a subset of columns/rows and may rename or
+    cast columns (see ``specs.py``); without one, the table's entry in
+    SYNC_SPECS_FILE is used, and failing that every column and row.  Row
+    filters ("where") are only honoured from SYNC_SPECS_FILE.
+
+    Every run is recorded in the run history (see ``runs.py``) under the
+    Celery task id, which retries share.
+    """
+
+    run = RunRecorder(self.request.id, table_name)
+    run.start()
+    logger = make_run_logger(
+        f"sync.{table_name}.{self.request.id}",
+        SSELogHandler(table_name),
+        RunLogHandler(run),
+    )
+    try:
+        _sync_table(self, logger, run, table_name, modified_col, restart, spec)
+    except Retry as exc:
+        run.finish("retrying", error=str(exc.exc or exc))
+        raise
+    except Exception as exc:
+        run.finish("failed", error=str(exc))
+        raise
+    else:
+        run.finish("success")
+    finally:
+        release_logger(logger)
+
+
+def _sync_table(task, logger, run, table_name, modified_col, restart, spec):
+    def progress(processed: int, total: int) -> None:
+        announce({"kind": "progress", "table": table_name, "processed": processed, "total": total})
+        run.progress(processed, total)
 
-    logger = logging.getLogger(f"sync.{table_name}.{self.request.id}")
-    logger.setLevel(logging.DEBUG)
-    logger.addHandler(SSELogHandler(table_name))
-    logger.propagate = False
     # initial heartbeat — lets the UI show the task immediately
     logger.info("Starting sync: table=%r  modified_col=%r", table_name, modified_col)
-    announce({"kind": "progress", "table": table_name, "processed": 0, "total": 0})
+    # only the first attempt honours "restart" — retries must resume
+    if restart and task.request.retries == 0:
+        clear_checkpoint(table_name)
+        logger.info("Restart requested; checkpoint for %r discarded.", table_name)
+    progress(0, 0)
 
     # ── 1) Engines ───────────────────────────────────────────────────────────
-    src_engine = create_engine(os.environ["SOURCE_DB_URI"])
+    # the source is only ever read; READ ONLY stops any stray write in its tracks
+    src_engine = create_engine(
+        os.environ["SOURCE_DB_URI"],
+        execution_options={"postgresql_readonly": True},
+    )
     tgt_engine = create_engine(os.environ["TARGET_DB_URI"])
     logger.debug("DSNs → src=%s  tgt=%s", src_engine.url, tgt_engine.url)
 
@@ -67,18 +116,30 @@ def sync_table_task(
     src_table = Table(table_name, src_meta, autoload_with=src_engine)
     logger.info("Source columns: %s", [c.name for c in src_table.columns])
 
+    # specs passed as task arguments are untrusted: no raw "where" SQL
+    spec = (
+        validate_spec(spec, allow_where=False) if spec is not None
+        else load_stored_spec(table_name)
+    )
+    proj = Projection(src_table, spec)
+    if spec:
+        logger.info("Sync spec: %s", spec)
+        logger.info("Projected columns: %s", proj.target_names)
+    run.phase_done("reflect")
+
     # ── 3) Ensure target exists ──────────────────────────────────────────────
     tgt_meta = MetaData()
     if not inspect(tgt_engine).has_table(table_name):
         logger.info("Creating target table %r…", table_name)
         tgt_table = Table(table_name, tgt_meta)
-        for col in src_table.columns:
-            tgt_table.append_column(col.copy())
+        for col in proj.target_columns():
+            tgt_table.append_column(col)
         tgt_meta.create_all(tgt_engine)
         logger.info("Table %r created.", table_name)
 
     tgt_table = Table(table_name, tgt_meta, autoload_with=tgt_engine)
     logger.info("Target table %r exists; proceeding to sync.", table_name)
+    run.phase_done("prepare_target")
 
     # ── 4) PK detection ──────────────────────────────────────────────────────
     pk_cols = list(src_table.primary_key.columns)
@@ -89,14 +150,14 @@ def sync_table_task(
         with tgt_engine.begin() as tgt_conn:
             deleted = tgt_conn.execute(delete(tgt_table)).rowcount
         logger.info("Cleared %d rows from %r", deleted, table_name)
-        announce({"kind": "progress", "table": table_name, "processed": 0, "total": 0})
+        progress(0, 0)
 
         # ➋ Pull all rows from source
         with src_engine.connect() as src_conn:
-            total = src_conn.execute(select(func.count()).select_from(src_table)).scalar() or 0
-            announce({"kind": "progress", "table": table_name, "processed": 0, "total": total})
+            total = src_conn.execute(proj.count(src_table)).scalar() or 0
+            progress(0, total)
 
-            rows = src_conn.execute(select(src_table)).mappings().all()
+            rows = src_conn.execute(proj.select()).mappings().all()
         logger.info("Fetched %d rows from %r", len(rows), table_name)
 
         # ➌ Bulk‑insert
@@ -104,32 +165,51 @@ def sync_table_task(
             with tgt_engine.begin() as tgt_conn:
                 tgt_conn.execute(pg_insert(tgt_table), rows)
             logger.info("Reloaded %d rows into %r", len(rows), table_name)
-            announce({
-                "kind": "progress",
-                "table": table_name,
-                "processed": len(rows),
-                "total": total,
-            })
+            progress(len(rows), total)
         else:
             logger.info("No rows found in source %r; nothing to load.", table_name)
+        run.phase_done("reload")
         return
 
     # ── 5) Chunked upsert (PK present) ───────────────────────────────────────
     with src_engine.connect() as conn:
-        total = conn.execute(select(func.count()).select_from(src_table)).scalar() or 0
-    announce({"kind": "progress", "table": table_name, "processed": 0, "total": total})
+        total = conn.execute(proj.count(src_table)).scalar() or 0
+    progress(0, total)
+    run.phase_done("count")
 
     pk_col = pk_cols[0]
+    pk_name = proj.target_name(pk_col.name)
     chunk_sz = int(os.getenv("CHUNK_SIZE", 10_000))
     processed = 0
     last_id = 0
-    has_mod = modified_col in src_table.c
+    mod_name = proj.target_name(modified_col)
+    has_mod = mod_name in proj.target_names and mod_name in tgt_table.c
+
+    fingerprint = spec_fingerprint(spec, modified_col)
+    ckpt = load_checkpoint(table_name)
+    if ckpt and ckpt.get("fingerprint") != fingerprint:
+        # a different spec selects a different row set — its position is meaningless
+        logger.info(
+            "Ignoring checkpoint from run %s: sync spec or modified_col changed.",
+            ckpt["run_id"],
+        )
+        ckpt = None
+    # the run whose checkpoint we hold; becomes ours once we commit a chunk
+    ckpt_owner = ckpt["run_id"] if ckpt else task.request.id
+    if ckpt:
+        last_id = ckpt["last_id"]
+        processed = ckpt["processed"]
+        logger.info(
+            "Resuming from checkpoint (run=%s, age=%ds): last_id=%r processed=%d",
+            ckpt["run_id"], time.time() - ckpt["updated_at"], last_id, processed,
+        )
+        progress(processed, total)
 
     while True:
         with src_engine.connect() as conn:
             chunk = (
                 conn.execute(
-                    select(src_table)
+                    proj.select()
                     .where(pk_col > last_id)
                     .order_by(pk_col)
                     .limit(chunk_sz)
@@ -141,23 +221,23 @@ def sync_table_task(
         if not chunk:
             break
 
-        last_id = chunk[-1][pk_col.name]
+        last_id = chunk[-1][pk_name]
         stmt = pg_insert(tgt_table).values(chunk)
         update_cols = {
-            c.name: getattr(stmt.excluded, c.name)
-            for c in tgt_table.columns
-            if c.name != pk_col.name
+            name: getattr(stmt.excluded, name)
+            for name in proj.target_names
+            if name != pk_name
         }
 
         if has_mod:
             stmt = stmt.on_conflict_do_update(
-                index_elements=[pk_col.name],
+                index_elements=[pk_name],
                 set_=update_cols,
-                where=(getattr(stmt.excluded, modified_col) > getattr(tgt_table.c, modified_col)),
+                where=(getattr(stmt.excluded, mod_name) > getattr(tgt_table.c, mod_name)),
             )
         else:
             stmt = stmt.on_conflict_do_update(
-                index_elements=[pk_col.name],
+                index_elements=[pk_name],
                 set_=update_cols,
             )
 
@@ -165,12 +245,9 @@ def sync_table_task(
             with tgt_engine.begin() as conn:
                 conn.execute(stmt)
             processed += len(chunk)
-            announce({
-                "kind": "progress",
-                "table": table_name,
-                "processed": processed,
-                "total": total,
-            })
+            save_checkpoint(table_name, task.request.id, last_id, processed, fingerprint)
+            ckpt_owner = task.request.id
+            progress(processed, total)
             logger.debug("Upserted %d rows; last_id=%r", len(chunk), last_id)
 
         except SQLAlchemyError as exc:
@@ -181,7 +258,9 @@ def sync_table_task(
                 "level": "error",
                 "message": str(exc),
             })
-            raise self.retry(exc=exc, countdown=30, max_retries=5)
+            raise task.retry(exc=exc, countdown=30, max_retries=5)
 
+    run.phase_done("copy")
+    clear_checkpoint(table_name, ckpt_owner)
     logger.info("Finished sync %r: %d/%d rows", table_name, processed, total)
-    announce({"kind": "progress", "table": table_name, "processed": total, "total": total})
+    progress(total, total)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Celery worker bootstrap.
+
+Each sample is a fresh interpreter, so module caches never hide the cost of
+an import.  Compares the lightweight worker factory with the full web app:
+
+    python bench_worker_startup.py                 # 5 samples each
+    python bench_worker_startup.py -n 10 --max-ms 1500
+
+With --max-ms the script exits non-zero when the worker median exceeds the
+budget, so it can gate CI / image builds for autoscaled worker pods.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+TARGETS = {
+    # a real worker boot also imports the CELERY_INCLUDE task modules
+    "worker (celery_worker)": (
+        "import celery_worker; celery_worker.celery.loader.import_default_modules()"
+    ),
+    "web (create_app)": "from app import create_app; create_app()",
+}
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def cold_start_ms(code: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", "--samples", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="fail if the worker median exceeds this budget")
+    args = parser.parse_args()
+
+    medians = {}
+    for label, code in TARGETS.items():
+        samples = [cold_start_ms(code) for _ in range(args.samples)]
+        medians[label] = statistics.median(samples)
+        print(f"{label:<24} median {medians[label]:8.1f} ms  "
+              f"(min {min(samples):.1f}, max {max(samples):.1f})")
+
+    worker = medians["worker (celery_worker)"]
+    if args.max_ms is not None and worker > args.max_ms:
+        print(f"❌ worker cold start {worker:.1f} ms exceeds budget {args.max_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
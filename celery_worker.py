@@ -6,11 +6,11 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import after loading env vars
-from app import create_app
+from app import create_worker_app
 
 def create_celery_app():
-    """Create and configure the Celery app"""
-    flask_app = create_app()
+    """Create and configure the Celery app (no blueprints / Swagger / CORS)"""
+    flask_app = create_worker_app()
     return flask_app.celery_app
 
 # Create the Celery instance